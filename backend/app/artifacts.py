@@ -0,0 +1,181 @@
+import hashlib
+import os
+import re
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from tempfile import NamedTemporaryFile
+from urllib.parse import quote, urlencode
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+ARTIFACT_DIR = os.environ.get("ARTIFACT_DIR", "/app/generated_pdfs")
+ARTIFACT_URL_PREFIX = "/api/artifacts"
+ARTIFACT_NAME_PATTERN = re.compile(r"[A-Za-z0-9_-]+\.pdf")
+# Stored artifacts are pruned on write: least recently used first, by age and total size.
+# Recency is tracked in st_atime; st_mtime stays the creation time and backs the validators.
+ARTIFACT_MAX_AGE_SECONDS = float(os.environ.get("ARTIFACT_MAX_AGE_HOURS", "24")) * 3600
+ARTIFACT_MAX_TOTAL_BYTES = int(os.environ.get("ARTIFACT_MAX_TOTAL_MB", "500")) * 1024 * 1024
+# Files used within this window are never evicted for size, so in-flight requests (e.g. a
+# bundle merge reading freshly rendered reports) keep their inputs
+ARTIFACT_IN_USE_SECONDS = 600
+
+
+def artifact_key(*parts):
+    """Build a stable content key from bytes/str parts (e.g. upload contents and match ids)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()[:32]
+
+
+def artifact_path(name):
+    """Return the on-disk path of an artifact, rejecting names that could escape ARTIFACT_DIR."""
+    if not ARTIFACT_NAME_PATTERN.fullmatch(name):
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return os.path.join(ARTIFACT_DIR, name)
+
+
+def artifact_url(name, download_name=None):
+    """URL under which GET /api/artifacts/{name} serves the artifact."""
+    url = f"{ARTIFACT_URL_PREFIX}/{name}"
+    if download_name:
+        url += "?" + urlencode({"download_name": download_name})
+    return url
+
+
+def find_artifact(name):
+    """Return the artifact path if it is stored, marking it as recently used so pruning keeps it."""
+    path = artifact_path(name)
+    try:
+        # Only bump the access time; mtime must keep matching the served Last-Modified/ETag
+        os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def new_artifact_tempfile():
+    """Create a uniquely named temporary file in ARTIFACT_DIR and return its path."""
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    with NamedTemporaryFile(dir=ARTIFACT_DIR, suffix=".tmp", delete=False) as tmp:
+        return tmp.name
+
+
+def store_artifact_file(tmp_path, name):
+    """Atomically move a finished temporary file into place so readers never see a partial file."""
+    path = artifact_path(name)
+    os.replace(tmp_path, path)
+    prune_artifacts()
+    return path
+
+
+def write_artifact(name, data):
+    """Store artifact bytes atomically."""
+    tmp_path = new_artifact_tempfile()
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        return store_artifact_file(tmp_path, name)
+    except Exception:
+        _unlink_quietly(tmp_path)
+        raise
+
+
+def prune_artifacts():
+    """
+    Delete artifacts unused for ARTIFACT_MAX_AGE_SECONDS, then the least recently used ones
+    while the directory exceeds ARTIFACT_MAX_TOTAL_BYTES.
+    """
+    entries = []
+    try:
+        with os.scandir(ARTIFACT_DIR) as it:
+            for entry in it:
+                try:
+                    if entry.is_file():
+                        stat_result = entry.stat()
+                        last_used = max(stat_result.st_atime, stat_result.st_mtime)
+                        entries.append((last_used, stat_result.st_size, entry.path))
+                except FileNotFoundError:
+                    continue
+    except FileNotFoundError:
+        return
+
+    now = time.time()
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for last_used, size, path in entries:
+        expired = now - last_used > ARTIFACT_MAX_AGE_SECONDS
+        # Temporary files belong to writes in progress; only remove them once abandoned
+        over_size = total > ARTIFACT_MAX_TOTAL_BYTES and now - last_used > ARTIFACT_IN_USE_SECONDS
+        if expired or (over_size and not path.endswith(".tmp")):
+            if _unlink_quietly(path):
+                total -= size
+                print(f"Pruned artifact {path}")
+
+
+def _unlink_quietly(path):
+    try:
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        print(f"Error removing artifact {path}: {e}")
+        return False
+
+
+def _etag(stat_result):
+    # The rendered bytes are not reproducible (reportlab embeds a creation date and document ID),
+    # so the validator identifies the stored file: a re-rendered artifact gets a new ETag and a
+    # resumed If-Range download starts over instead of splicing two different files
+    return f'"{stat_result.st_ino:x}-{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def _is_not_modified(request, etag, stat_result):
+    """Evaluate If-None-Match / If-Modified-Since against the artifact (If-None-Match wins)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return int(stat_result.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _content_disposition(filename):
+    ascii_name = re.sub(r'[^A-Za-z0-9._-]', '_', filename)
+    return f"attachment; filename={ascii_name}; filename*=UTF-8''{quote(filename)}"
+
+
+def artifact_response(request: Request, name, download_name=None):
+    """
+    Serve a stored artifact as a file response for GET/HEAD.
+
+    FileResponse answers Range requests and reads the file from disk in 64 KB chunks;
+    it is only zero-copy on servers implementing the ASGI pathsend extension, which
+    uvicorn (used in the image) does not. ETag/Last-Modified let clients revalidate
+    and receive 304 Not Modified instead of the full file.
+    """
+    path = artifact_path(name)
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    etag = _etag(stat_result)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+    if request.method in ("GET", "HEAD") and _is_not_modified(request, etag, stat_result):
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = _content_disposition(download_name or name)
+    return FileResponse(path, media_type="application/pdf", headers=headers, stat_result=stat_result)
@@ -1,3 +1,5 @@
+import re
+import numpy as np
 import pandas as pd
 from openpyxl import load_workbook
 from tempfile import NamedTemporaryFile
@@ -10,15 +12,102 @@ def read_spielplan(file_bytes):
     df = pd.read_excel(io.BytesIO(file_bytes), sheet_name='Ergebnisse')
     return df
 
-def create_spielbericht(match, template_bytes, template_placeholders, players_by_team=None):
-    """Create a single match report with improved exception resilience, using template_placeholders for efficient replacement."""
+# Age category rules: (substrings matched in lowercase "Liga Gruppe", Spielzeit, Pause).
+# The first matching rule wins; matches without a rule fall back to the defaults below.
+AGE_CATEGORY_RULES = [
+    (["u12", "u-12", "u 12"], "2x7 Minuten", "3 Minuten"),
+    (["u14", "u-14", "u 14", "u16", "u-16", "u 16"], "2x10 Minuten", "5 Minuten"),
+]
+DEFAULT_DURATION = "2x10 Minuten"
+DEFAULT_PAUSE = "3 Minuten"
+PLAYERS_PER_TEAM = 10
+
+
+def _text_column(df, name):
+    """Return a column with missing values replaced by empty strings (empty column if absent)."""
+    if name not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    column = df[name].astype(object)
+    return column.where(column.notna(), "")
+
+
+def _players_table(players_by_team, suffix):
+    """
+    Flatten players_by_team into one row per (Liga, Team) with the player placeholders
+    $NAME<suffix>1..10 and $N<suffix>1..10 already filled in.
+    """
+    name_cols = [f"$NAME{suffix}{i}" for i in range(1, PLAYERS_PER_TEAM + 1)]
+    number_cols = [f"$N{suffix}{i}" for i in range(1, PLAYERS_PER_TEAM + 1)]
+    rows = []
+    for liga, teams in (players_by_team or {}).items():
+        for team, players in teams.items():
+            players = players[:PLAYERS_PER_TEAM]
+            names = [p.get("Name", "") for p in players]
+            numbers = [str(p.get("Nummer", "")) + " " if p.get("Nummer", "") else "" for p in players]
+            padding = [""] * (PLAYERS_PER_TEAM - len(players))
+            rows.append([liga, team] + names + padding + numbers + padding)
+    return pd.DataFrame(rows, columns=["_liga", "_team"] + name_cols + number_cols, dtype=object)
+
+
+def build_placeholder_table(spielplan_df, players_by_team=None, age_category_rules=None,
+                            default_duration=DEFAULT_DURATION, default_pause=DEFAULT_PAUSE):
+    """
+    Compute the final placeholder values for every match in one vectorised pass.
+
+    Returns a DataFrame with one row per match (same order as spielplan_df) and one
+    column per placeholder ($HEIM, $GEGNER, $DURATION, $NAMEH1, ...).
+    """
+    if age_category_rules is None:
+        age_category_rules = AGE_CATEGORY_RULES
+
+    df = spielplan_df.reset_index(drop=True)
+    liga = _text_column(df, "Liga")
+    gruppe = _text_column(df, "Gruppe")
+    team1 = _text_column(df, "Team 1")
+    team2 = _text_column(df, "Team 2")
+
+    # Determine Spielzeit based on age category in liga or gruppe
+    liga_gruppe = (liga.astype(str) + " " + gruppe.astype(str)).str.lower()
+    duration = pd.Series(default_duration, index=df.index, dtype=object)
+    pause = pd.Series(default_pause, index=df.index, dtype=object)
+    # Apply rules last to first so the first matching rule wins
+    for patterns, rule_duration, rule_pause in reversed(age_category_rules):
+        matches = liga_gruppe.str.contains("|".join(re.escape(p) for p in patterns), regex=True)
+        duration = duration.mask(matches, rule_duration)
+        pause = pause.mask(matches, rule_pause)
+
+    table = pd.DataFrame({
+        "$HEIM": team1,
+        "$GEGNER": team2,
+        "$SCHIRI": _text_column(df, "Schiedsrichter"),
+        "$SCHIRI2": _text_column(df, "Schiedsrichter 2"),
+        "$DATE": _text_column(df, "Tag"),
+        "$TIME": _text_column(df, "Startzeit"),
+        "$FIELD": _text_column(df, "Feld"),
+        "$LIGA": liga,
+        "$NO": pd.Series(np.arange(1, len(df) + 1), index=df.index, dtype=object),
+        "$VERMERK": gruppe.astype(str),
+        "$DURATION": duration,
+        "$PAUSE": pause,
+    })
+
+    # Attach player placeholders by looking up (Liga, Team) for home and guest teams
+    lookup_keys = pd.DataFrame({"_liga": liga.astype(str)})
+    for suffix, team in (("H", team1), ("G", team2)):
+        players = _players_table(players_by_team, suffix)
+        keys = lookup_keys.assign(_team=team.astype(str))
+        joined = keys.merge(players, on=["_liga", "_team"], how="left").drop(columns=["_liga", "_team"])
+        joined.index = df.index
+        table = table.join(joined.astype(object).where(joined.notna(), ""))
+
+    return table
+
+
+def create_spielbericht(placeholder_values, template_bytes, template_placeholders):
+    """Create a single match report by filling template_placeholders from a precomputed placeholder row."""
     tf = None
     tmp_out = None
     result_bytes = None
-    print("Creating match report...")
-    print("Template placeholders:")
-    for row, col, placeholder in template_placeholders:
-        print(f" - {placeholder} (Cell: {row},{col})")
     try:
         tf = NamedTemporaryFile(delete=False, suffix='.xlsx')
         tf.write(template_bytes)
@@ -30,26 +119,6 @@ def create_spielbericht(match, template_bytes, template_placeholders, players_by
             print(f"Error loading workbook: {e}")
             return None
 
-        # Extract match data with error handling
-        try:
-            no = match.get('id', "")
-            startzeit = match.get('Startzeit', "")
-            datum = match.get('Tag', "")
-            spielfeld = match.get('Feld', "")
-            liga = match.get('Liga', "")
-            gruppe = match.get('Gruppe', "")
-            if pd.isna(gruppe):
-                gruppe = ""
-            team1 = match.get('Team 1', "")
-            team2 = match.get('Team 2', "")
-            schiedsrichter1 = match.get('Schiedsrichter', "")
-            schiedsrichter2 = match.get('Schiedsrichter 2', "")
-            if pd.isna(schiedsrichter2):
-                schiedsrichter2 = ""
-        except Exception as e:
-            print(f"Error extracting match data: {e}")
-            return None
-
         from openpyxl.styles import Alignment
 
         def safe_set_cell(row, col, value):
@@ -62,83 +131,6 @@ def create_spielbericht(match, template_bytes, template_placeholders, players_by
             except Exception as e:
                 print(f"Error setting cell ({row},{col}): {e}")
 
-        # Get player data for teams if available
-        team1_players = []
-        team2_players = []
-
-        if players_by_team:
-            # Try to find players for team1 and team2 in their respective Liga
-            if liga in players_by_team:
-                # Team 1 players
-                if team1 in players_by_team[liga]:
-                    team1_players = players_by_team[liga][team1]
-                    print(f"Found {len(team1_players)} players for team '{team1}' in liga '{liga}'")
-                else:
-                    print(f"No players found for team '{team1}' in liga '{liga}'")
-
-                # Team 2 players
-                if team2 in players_by_team[liga]:
-                    team2_players = players_by_team[liga][team2]
-                    print(f"Found {len(team2_players)} players for team '{team2}' in liga '{liga}'")
-                else:
-                    print(f"No players found for team '{team2}' in liga '{liga}'")
-
-        # Determine Spielzeit based on age category in liga or gruppe
-        liga_gruppe = f"{liga} {gruppe}".lower()
-
-        # Check for U12, u12, U-12 variations in both liga and gruppe
-        if any(u12_pattern in liga_gruppe for u12_pattern in ["u12", "u-12", "u 12"]):
-            duration = "2x7 Minuten"
-            pause = "3 Minuten"
-
-        # Check for U14, U16 variations
-        elif any(pattern in liga_gruppe for pattern in ["u14", "u-14", "u 14", "u16", "u-16", "u 16"]):
-            duration = "2x10 Minuten"
-            pause = "5 Minuten"
-
-
-        # Create the vermerk text with "GRUPPE"
-        vermerk_text = f"{gruppe}"
-
-        # Mapping from placeholder to value
-        placeholder_values = {
-            "$HEIM": team1,
-            "$GEGNER": team2,
-            "$SCHIRI": schiedsrichter1,
-            "$SCHIRI2": schiedsrichter2,
-            "$DATE": datum,
-            "$TIME": startzeit,
-            "$FIELD": spielfeld,
-            "$LIGA": liga,
-            "$NO": no,
-            "$VERMERK": vermerk_text,
-            "$DURATION": duration,
-            "$PAUSE": pause
-        }
-
-        # Add player placeholders for Team 1 (Home)
-        for i in range(1, 11):  # Player numbers 1-10
-            player_idx = i - 1
-            if player_idx < len(team1_players):
-                placeholder_values[f"$NAMEH{i}"] = team1_players[player_idx].get("Name", "")
-                nummer_h = team1_players[player_idx].get("Nummer", "")
-                placeholder_values[f"$NH{i}"] = str(nummer_h) + " " if nummer_h else ""
-            else:
-                placeholder_values[f"$NAMEH{i}"] = ""
-                placeholder_values[f"$NH{i}"] = ""
-
-        # Add player placeholders for Team 2 (Away/Guest)
-        for i in range(1, 11):  # Player numbers 1-10
-            player_idx = i - 1
-            if player_idx < len(team2_players):
-                placeholder_values[f"$NAMEG{i}"] = team2_players[player_idx].get("Name", "")
-                nummer_g = team2_players[player_idx].get("Nummer", "")
-                placeholder_values[f"$NG{i}"] = str(nummer_g) + " " if nummer_g else ""
-            else:
-                placeholder_values[f"$NAMEG{i}"] = ""
-                placeholder_values[f"$NG{i}"] = ""
-
-
         for row, col, placeholder in template_placeholders:
             value = placeholder_values.get(placeholder, None)
             try:
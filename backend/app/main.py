@@ -1,15 +1,16 @@
 from .util import clean_json, find_placeholders_in_template, read_players_by_team
-import io
-from typing import List
+from typing import List, Optional
 import json
 import numpy as np
 from fastapi import FastAPI, File, UploadFile, HTTPException, Request
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from .generator import read_spielplan, create_spielbericht
+from .generator import read_spielplan, create_spielbericht, build_placeholder_table
 from .pdf_converter import excel_to_pdf
 from app.einsaetze_pdf import create_einsaetze_pdf
+from .artifacts import (artifact_key, artifact_path, artifact_response, artifact_url, find_artifact,
+                        new_artifact_tempfile, store_artifact_file, write_artifact)
 import pandas as pd
 import os
 import subprocess
@@ -25,6 +26,8 @@ template_bytes = None
 spielplan_df = None
 template_placeholders = None
 players_by_team = None
+placeholder_table = None
+upload_key = None
 
 
 @app.get("/")
@@ -42,12 +45,14 @@ async def einsaetze_pdf_endpoint(request: Request):
         # Validate input
         if not isinstance(einsaetze_list, list):
             return JSONResponse(status_code=400, content={"success": False, "detail": "Input must be a list of einsätze objects."})
-        pdf_bytes = create_einsaetze_pdf(einsaetze_list, filtered_teams)
-        return StreamingResponse(
-            io.BytesIO(pdf_bytes),
-            media_type='application/pdf',
-            headers={'Content-Disposition': 'attachment; filename=einsaetze_uebersicht.pdf'}
-        )
+        artifact_name = f"einsaetze_{artifact_key(json.dumps(payload, sort_keys=True))}.pdf"
+        if find_artifact(artifact_name) is None:
+            write_artifact(artifact_name, create_einsaetze_pdf(einsaetze_list, filtered_teams))
+        return JSONResponse(status_code=200, content={
+            "success": True,
+            "url": artifact_url(artifact_name, 'einsaetze_uebersicht.pdf'),
+            "filename": 'einsaetze_uebersicht.pdf'
+        })
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -58,7 +63,7 @@ async def upload_files(
     spielplan: UploadFile = File(...),
     players: UploadFile = File(None)
 ):
-    global spielplan_bytes, template_bytes, spielplan_df, template_placeholders, players_by_team
+    global spielplan_bytes, template_bytes, spielplan_df, template_placeholders, players_by_team, placeholder_table, upload_key
 
     print("Upload endpoint called")
     try:
@@ -66,28 +71,37 @@ async def upload_files(
         if not spielplan.filename.endswith('.xlsx'):
             return JSONResponse(status_code=400, content={"success": False, "detail": "Spielplan must be an Excel file (.xlsx)"})
 
-        spielplan_bytes = await spielplan.read()
+        # Build everything into locals and publish the globals together once the upload succeeded,
+        # so a failed upload never mixes new template/players data with the old placeholder table
+        new_spielplan_bytes = await spielplan.read()
         # Read template from file system
         with open("/app/assets/template.xlsx", "rb") as f:
-            template_bytes = f.read()
-        spielplan_df = read_spielplan(spielplan_bytes)
-        template_placeholders = find_placeholders_in_template(template_bytes)
+            new_template_bytes = f.read()
+        new_spielplan_df = read_spielplan(new_spielplan_bytes)
+        new_template_placeholders = find_placeholders_in_template(new_template_bytes)
+        print("Template placeholders:")
+        for row, col, placeholder in new_template_placeholders:
+            print(f" - {placeholder} (Cell: {row},{col})")
 
         # Handle players file if provided
         if players is not None:
             players_bytes = await players.read()
-            players_by_team = read_players_by_team(players_bytes)
-            print("Players loaded:", players_by_team)
+            new_players_by_team = read_players_by_team(players_bytes)
+            print("Players loaded:", new_players_by_team)
         else:
-            players_by_team = None
+            players_bytes = b""
+            new_players_by_team = None
 
         print("Spielplan read successfully")
         # Replace NaN and infinite values with None
-        spielplan_df = spielplan_df.replace([np.inf, -np.inf], np.nan)
-        spielplan_df = spielplan_df.where(pd.notnull(spielplan_df), None)
+        new_spielplan_df = new_spielplan_df.replace([np.inf, -np.inf], np.nan)
+        new_spielplan_df = new_spielplan_df.where(pd.notnull(new_spielplan_df), None)
+
+        # Precompute the placeholder values for all matches once per upload
+        new_placeholder_table = build_placeholder_table(new_spielplan_df, new_players_by_team)
 
         # Add index for frontend
-        matches = spielplan_df.reset_index().to_dict(orient='records')
+        matches = new_spielplan_df.reset_index().to_dict(orient='records')
         for i, match in enumerate(matches):
             match['id'] = i + 1
 
@@ -105,6 +119,15 @@ async def upload_files(
             print("JSON serialization error:", json_err)
             return JSONResponse(status_code=500, content={"success": False, "detail": f"JSON serialization error: {str(json_err)}"})
 
+        # Generated artifacts are keyed by the uploaded contents so repeated requests reuse them
+        spielplan_bytes = new_spielplan_bytes
+        template_bytes = new_template_bytes
+        spielplan_df = new_spielplan_df
+        template_placeholders = new_template_placeholders
+        players_by_team = new_players_by_team
+        placeholder_table = new_placeholder_table
+        upload_key = artifact_key(new_spielplan_bytes, players_bytes, new_template_bytes)
+
         print("Returning success response from /api/upload")
         return JSONResponse(
             status_code=200,
@@ -125,10 +148,10 @@ async def upload_files(
 
 @app.post("/api/generate")
 async def generate_reports(match_ids: List[int]):
-    global spielplan_df, template_bytes, template_placeholders, players_by_team
+    global template_bytes, template_placeholders, placeholder_table, upload_key
 
     print(f"generate_reports called with match_ids: {match_ids}")
-    if spielplan_df is None or template_bytes is None or template_placeholders is None:
+    if placeholder_table is None or template_bytes is None or template_placeholders is None:
         print("Error: Required data not uploaded yet.")
         raise HTTPException(status_code=400, detail="Please upload files first")
 
@@ -137,77 +160,60 @@ async def generate_reports(match_ids: List[int]):
             print("Generating report for a single match.")
             match_id = match_ids[0]
             print(f"Single match_id: {match_id}")
-            if not (0 < match_id <= len(spielplan_df)):
+            if not (0 < match_id <= len(placeholder_table)):
                 print(f"Invalid match ID: {match_id}")
                 raise HTTPException(status_code=400, detail="Invalid match ID")
 
-            # Create a dictionary from the row and add the id
-            match_dict = spielplan_df.iloc[match_id- 1].to_dict()
-            match_dict['id'] = match_id
-            print(f"Match data: {match_dict}")
-            excel_bytes = create_spielbericht(match_dict, template_bytes, template_placeholders, players_by_team)
-            print("Excel bytes for match created.")
-            pdf_bytes = excel_to_pdf(excel_bytes)
-            print("PDF bytes for match created.")
+            placeholder_values = placeholder_table.iloc[match_id - 1].to_dict()
+            artifact_name = match_artifact(match_id, placeholder_values)
 
-            filename = f"spielbericht_{match_id+1}_{match_dict['Team 1']}_vs_{match_dict['Team 2']}.pdf"
+            filename = f"spielbericht_{match_id+1}_{placeholder_values['$HEIM']}_vs_{placeholder_values['$GEGNER']}.pdf"
             filename = filename.replace(" ", "_").replace("/", "_")
             print(f"PDF filename: {filename}")
 
-            print("Returning single PDF as StreamingResponse.")
-            return StreamingResponse(
-                io.BytesIO(pdf_bytes),
-                media_type='application/pdf',
-                headers={'Content-Disposition': f'attachment; filename={filename}'}
-            )
+            print("Returning single PDF artifact URL.")
+            return JSONResponse(status_code=200, content={
+                "success": True,
+                "url": artifact_url(artifact_name, filename),
+                "filename": filename
+            })
         else:
             print("Generating reports for multiple matches.")
 
-            pdf_dir = "/app/generated_pdfs"
-            os.makedirs(pdf_dir, exist_ok=True)
             pdf_paths = []
+            valid_ids = []
 
             for match_id in match_ids:
                 print(f"Processing match_id: {match_id}")
-                if not (0 < match_id <= len(spielplan_df)):
+                if not (0 < match_id <= len(placeholder_table)):
                     print(f"Skipping invalid match ID: {match_id}")
                     continue
 
-                # Create a dictionary from the row and add the id
-                match_dict = spielplan_df.iloc[match_id- 1].to_dict()
-                match_dict['id'] = match_id
-                print(f"Match data: {match_dict}")
-                excel_bytes = create_spielbericht(match_dict, template_bytes, template_placeholders, players_by_team)
-                print("Excel bytes for match created.")
-                pdf_bytes = excel_to_pdf(excel_bytes)
-                print("PDF bytes for match created.")
-
-                filename = f"spielbericht_{match_id+1}_{match_dict['Team 1']}_vs_{match_dict['Team 2']}.pdf"
-                filename = filename.replace(" ", "_").replace("/", "_")
-                pdf_path = os.path.join(pdf_dir, filename)
-                with open(pdf_path, "wb") as f:
-                    f.write(pdf_bytes)
-                pdf_paths.append(pdf_path)
-                print(f"Saved PDF for match_id: {match_id} to {pdf_path}")
-
-            merged_pdf_path = os.path.join(pdf_dir, "spielberichte_merged.pdf")
-            merge_cmd = ["pdfunite"] + pdf_paths + [merged_pdf_path]
-            print(f"Merging PDFs with command: {' '.join(merge_cmd)}")
-            try:
-                subprocess.run(merge_cmd, check=True)
-            except Exception as e:
-                print(f"Error merging PDFs: {e}")
-                raise HTTPException(status_code=500, detail="Failed to merge PDFs")
-
-            with open(merged_pdf_path, "rb") as f:
-                merged_pdf_bytes = f.read()
-
-            print("Returning merged PDF as StreamingResponse.")
-            return StreamingResponse(
-                io.BytesIO(merged_pdf_bytes),
-                media_type='application/pdf',
-                headers={'Content-Disposition': 'attachment; filename=spielberichte.pdf'}
-            )
+                placeholder_values = placeholder_table.iloc[match_id - 1].to_dict()
+                pdf_paths.append(artifact_path(match_artifact(match_id, placeholder_values)))
+                valid_ids.append(str(match_id))
+
+            merged_name = f"spielberichte_{artifact_key(upload_key, *valid_ids)}.pdf"
+            if find_artifact(merged_name) is None:
+                # Merge into a unique temporary file first so a partial bundle is never served
+                tmp_merged_path = new_artifact_tempfile()
+                merge_cmd = ["pdfunite"] + pdf_paths + [tmp_merged_path]
+                print(f"Merging PDFs with command: {' '.join(merge_cmd)}")
+                try:
+                    subprocess.run(merge_cmd, check=True)
+                    store_artifact_file(tmp_merged_path, merged_name)
+                except Exception as e:
+                    print(f"Error merging PDFs: {e}")
+                    if os.path.exists(tmp_merged_path):
+                        os.unlink(tmp_merged_path)
+                    raise HTTPException(status_code=500, detail="Failed to merge PDFs")
+
+            print("Returning merged PDF artifact URL.")
+            return JSONResponse(status_code=200, content={
+                "success": True,
+                "url": artifact_url(merged_name, 'spielberichte.pdf'),
+                "filename": 'spielberichte.pdf'
+            })
 
     except Exception as e:
         import traceback
@@ -215,6 +221,27 @@ async def generate_reports(match_ids: List[int]):
         traceback.print_exc()
         return JSONResponse(status_code=500, content={"success": False, "message": f"Error generating reports: {str(e)}"})
 
+def match_artifact(match_id, placeholder_values):
+    """Return the artifact name of a match report, rendering it only if it is not stored yet."""
+    artifact_name = f"spielbericht_{artifact_key(upload_key, str(match_id))}.pdf"
+    if find_artifact(artifact_name) is not None:
+        print(f"Reusing stored PDF for match_id: {match_id}")
+        return artifact_name
+
+    excel_bytes = create_spielbericht(placeholder_values, template_bytes, template_placeholders)
+    print("Excel bytes for match created.")
+    pdf_bytes = excel_to_pdf(excel_bytes)
+    print("PDF bytes for match created.")
+    pdf_path = write_artifact(artifact_name, pdf_bytes)
+    print(f"Saved PDF for match_id: {match_id} to {pdf_path}")
+    return artifact_name
+
+
+@app.api_route("/api/artifacts/{artifact_name}", methods=["GET", "HEAD"])
+async def get_artifact(artifact_name: str, request: Request, download_name: Optional[str] = None):
+    """Download a stored report or bundle; supports Range and conditional requests."""
+    return artifact_response(request, artifact_name, download_name)
+
 @app.get("/api/health")
 def health():
     return {"status": "ok", "message": "Spielbericht Generator API is running"}
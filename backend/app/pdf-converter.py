@@ -1,130 +1,607 @@
-from tempfile import NamedTemporaryFile
 import os
-import subprocess
+import re
 import io
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+import datetime
+from decimal import Decimal
+import colorsys
+from reportlab.lib.pagesizes import A3, A4, A5, LEGAL, LETTER, landscape
+from reportlab.lib.utils import ImageReader, simpleSplit
 from reportlab.lib import colors
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
 from openpyxl import load_workbook
+from openpyxl.styles.colors import COLOR_INDEX
+from openpyxl.utils.cell import column_index_from_string, range_boundaries
+
+# Excel paperSize codes -> reportlab page sizes
+PAPER_SIZES = {1: LETTER, 5: LEGAL, 8: A3, 9: A4, 11: A5}
+
+# Border style -> (line width in pt, dash pattern)
+BORDER_STYLES = {
+    'hair': (0.25, None),
+    'thin': (0.5, None),
+    'medium': (1.0, None),
+    'thick': (1.5, None),
+    'double': (1.5, None),
+    'dashed': (0.5, (3, 2)),
+    'dotted': (0.5, (1, 1)),
+    'dashDot': (0.5, (3, 1, 1, 1)),
+    'dashDotDot': (0.5, (3, 1, 1, 1, 1, 1)),
+    'mediumDashed': (1.0, (4, 2)),
+    'mediumDashDot': (1.0, (4, 2, 1, 2)),
+    'mediumDashDotDot': (1.0, (4, 2, 1, 2, 1, 2)),
+    'slantDashDot': (1.0, (4, 1, 2, 1)),
+}
+
+# Default Office theme palette (lt1, dk1, lt2, dk2, accent1-6, hlink, folHlink)
+THEME_COLORS = [
+    'FFFFFF', '000000', 'E7E6E6', '44546A', '4472C4', 'ED7D31',
+    'A5A5A5', 'FFC000', '5B9BD5', '70AD47', '0563C1', '954F72',
+]
+
+# Font family -> TrueType faces (regular, bold, italic, bold italic) relative to FONT_ROOT.
+# Liberation and Carlito are metric-compatible with the Microsoft fonts used in the
+# template, so text fits the cells like in Excel/LibreOffice and covers non-cp1252
+# names. Unknown families use DejaVu Sans; base-14 fonts are only the last resort.
+FONT_ROOT = os.environ.get("FONT_ROOT", "/usr/share/fonts/truetype")
+LIBERATION_SANS = ('liberation/LiberationSans-Regular.ttf', 'liberation/LiberationSans-Bold.ttf',
+                   'liberation/LiberationSans-Italic.ttf', 'liberation/LiberationSans-BoldItalic.ttf')
+LIBERATION_SERIF = ('liberation/LiberationSerif-Regular.ttf', 'liberation/LiberationSerif-Bold.ttf',
+                    'liberation/LiberationSerif-Italic.ttf', 'liberation/LiberationSerif-BoldItalic.ttf')
+LIBERATION_MONO = ('liberation/LiberationMono-Regular.ttf', 'liberation/LiberationMono-Bold.ttf',
+                   'liberation/LiberationMono-Italic.ttf', 'liberation/LiberationMono-BoldItalic.ttf')
+CARLITO = ('crosextra/Carlito-Regular.ttf', 'crosextra/Carlito-Bold.ttf',
+           'crosextra/Carlito-Italic.ttf', 'crosextra/Carlito-BoldItalic.ttf')
+DEJAVU_SANS = ('dejavu/DejaVuSans.ttf', 'dejavu/DejaVuSans-Bold.ttf',
+               'dejavu/DejaVuSans-Oblique.ttf', 'dejavu/DejaVuSans-BoldOblique.ttf')
+HELVETICA = ('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique', 'Helvetica-BoldOblique')
+TIMES = ('Times-Roman', 'Times-Bold', 'Times-Italic', 'Times-BoldItalic')
+COURIER = ('Courier', 'Courier-Bold', 'Courier-Oblique', 'Courier-BoldOblique')
+
+# Lowercase family name -> (TrueType faces to try in order, base-14 fallback)
+FONT_FAMILIES = {
+    'arial': ((LIBERATION_SANS, DEJAVU_SANS), HELVETICA),
+    'helvetica': ((LIBERATION_SANS, DEJAVU_SANS), HELVETICA),
+    'liberation sans': ((LIBERATION_SANS, DEJAVU_SANS), HELVETICA),
+    'calibri': ((CARLITO, DEJAVU_SANS), HELVETICA),
+    'carlito': ((CARLITO, DEJAVU_SANS), HELVETICA),
+    'times new roman': ((LIBERATION_SERIF,), TIMES),
+    'liberation serif': ((LIBERATION_SERIF,), TIMES),
+    'courier new': ((LIBERATION_MONO,), COURIER),
+    'liberation mono': ((LIBERATION_MONO,), COURIER),
+}
+DEFAULT_FONT_FAMILY = ((DEJAVU_SANS,), HELVETICA)
+_resolved_font_families = {}
+
+EMU_PER_POINT = 12700
+CELL_PADDING = 2
+LINE_SPACING = 1.17
+SIMPLE_REFERENCE = re.compile(r"^=(?:'((?:[^']|'')+)'!|([^'!\s]+)!)?\$?([A-Za-z]{1,3})\$?(\d+)$")
+
 
 def excel_to_pdf(excel_bytes):
-    """Convert Excel bytes to PDF bytes using LibreOffice"""
+    """Convert Excel bytes to PDF bytes using the native reportlab renderer"""
+    return excel_to_pdf_native(excel_bytes)
+
 
-    # Create temporary Excel file
-    with NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_excel:
-        temp_excel.write(excel_bytes)
-        temp_excel.flush()
-        excel_path = temp_excel.name
+def excel_to_pdf_native(excel_bytes):
+    """
+    Render the active sheet of an Excel workbook to a single PDF page with reportlab.
 
+    The layout is read from the workbook itself: print area, page setup and margins,
+    column widths, row heights, merged cells, fills, borders, fonts, alignment and
+    embedded images. Simple cell-reference formulas (e.g. '=B22') are resolved;
+    other formulas render empty since there is no calculation engine.
+    """
     try:
-        # Create temporary directory for output
-        temp_dir = os.path.dirname(excel_path)
+        wb = load_workbook(io.BytesIO(excel_bytes))
+        ws = wb.active
+
+        min_col, min_row, max_col, max_row = _print_area(ws)
+        col_widths = _column_widths(ws)
+        row_heights = _row_heights(ws)
+        col_x = _offsets(col_widths, min_col, max_col)
+        row_y = _offsets(row_heights, min_row, max_row)
+        content_width = col_x[-1]
+        content_height = row_y[-1]
+
+        # Page setup
+        page_size = PAPER_SIZES.get(ws.page_setup.paperSize or 9, A4)
+        if ws.page_setup.orientation == 'landscape':
+            page_size = landscape(page_size)
+        page_width, page_height = page_size
+        margins = ws.page_margins
+        left, right = margins.left * 72, margins.right * 72
+        top, bottom = margins.top * 72, margins.bottom * 72
+        usable_width = page_width - left - right
+        usable_height = page_height - top - bottom
 
-        # Convert Excel to PDF using LibreOffice
-        result = subprocess.run([
-            'libreoffice', '--headless', '--convert-to', 'pdf',
-            '--outdir', temp_dir, excel_path
-        ], capture_output=True, text=True, timeout=30)
+        fit_scale = min(usable_width / content_width, usable_height / content_height)
+        page_setup_pr = ws.sheet_properties.pageSetUpPr
+        if page_setup_pr is not None and page_setup_pr.fitToPage:
+            scale = fit_scale
+        else:
+            # Keep the report on a single sheet even if the template overflows the page
+            scale = min((ws.page_setup.scale or 100) / 100, fit_scale)
 
-        if result.returncode != 0:
-            raise Exception(f"LibreOffice conversion failed: {result.stderr}")
+        if ws.print_options.horizontalCentered:
+            left += (usable_width - content_width * scale) / 2
+        if ws.print_options.verticalCentered:
+            top += (usable_height - content_height * scale) / 2
 
-        # Read the generated PDF
-        pdf_path = excel_path.replace('.xlsx', '.pdf')
-        if not os.path.exists(pdf_path):
-            raise Exception("PDF file was not created")
+        pdf_buffer = io.BytesIO()
+        c = canvas.Canvas(pdf_buffer, pagesize=page_size)
+        # Work in sheet coordinates: origin at the top-left of the print area, y growing downwards
+        c.translate(left, page_height - top)
+        c.scale(scale, scale)
+
+        merged = _merged_ranges(ws, min_col, min_row, max_col, max_row)
+        values = _cell_texts(ws, min_col, min_row, max_col, max_row)
+
+        def cell_rect(col, row):
+            start_col, start_row, end_col, end_row = merged.get((col, row), (col, row, col, row))
+            x0 = col_x[start_col - min_col]
+            x1 = col_x[min(end_col, max_col) - min_col + 1]
+            y0 = row_y[start_row - min_row]
+            y1 = row_y[min(end_row, max_row) - min_row + 1]
+            return x0, y0, x1, y1
+
+        if ws.print_options.gridLines:
+            _draw_gridlines(c, col_x, row_y)
+
+        # Fills first so borders and text are drawn on top
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                if _is_covered(merged, col, row):
+                    continue
+                cell = ws.cell(row, col)
+                if cell.fill is None or cell.fill.fill_type != 'solid':
+                    continue
+                fill_color = _excel_color(cell.fill.fgColor)
+                if fill_color is None:
+                    continue
+                x0, y0, x1, y1 = cell_rect(col, row)
+                c.setFillColor(fill_color)
+                c.rect(x0, -y1, x1 - x0, y1 - y0, stroke=0, fill=1)
 
-        with open(pdf_path, 'rb') as f:
-            pdf_bytes = f.read()
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                _draw_cell_borders(c, ws.cell(row, col), merged.get((col, row)), col, row,
+                                   col_x[col - min_col], row_y[row - min_row],
+                                   col_x[col - min_col + 1], row_y[row - min_row + 1])
 
-        # Cleanup
-        os.unlink(pdf_path)
+        for image in ws._images:
+            _draw_image(c, image, col_widths, row_heights, min_col, min_row)
 
-        return pdf_bytes
+        for (col, row), (text, is_number) in values.items():
+            if _is_covered(merged, col, row):
+                continue
+            cell = ws.cell(row, col)
+            rect = cell_rect(col, row)
+            clip = rect if (col, row) in merged else _overflow_rect(
+                rect, cell, is_number, values, merged, col, row, min_col, max_col, col_x)
+            _draw_cell_text(c, text, cell, rect, clip, is_number)
+
+        c.showPage()
+        c.save()
+        pdf_buffer.seek(0)
+        return pdf_buffer.read()
 
     except Exception as e:
-        raise Exception(f"PDF conversion failed: {str(e)}")
-    finally:
-        # Cleanup Excel file
-        if os.path.exists(excel_path):
-            os.unlink(excel_path)
-
-def excel_to_pdf_alternative(excel_bytes):
-    """Alternative PDF conversion using openpyxl and reportlab (if LibreOffice not available)"""
+        raise Exception(f"Native PDF conversion failed: {str(e)}")
+
+
+def _print_area(ws):
+    """Return (min_col, min_row, max_col, max_row) of the first print area range, or the used range."""
+    print_area = ws.print_area
+    if isinstance(print_area, (list, tuple)):
+        print_area = print_area[0] if print_area else None
+    if print_area:
+        first_range = print_area.split(',')[0].split('!')[-1].replace('$', '')
+        return range_boundaries(first_range)
+    return ws.min_column, ws.min_row, ws.max_column, ws.max_row
+
+
+def _char_width_to_points(width):
+    """Convert an Excel column width (in characters of the default font) to points."""
+    pixels = int(((256 * width + int(128 / 7)) / 256) * 7)
+    return pixels * 0.75
+
+
+def _column_widths(ws):
+    """Return a function mapping a 1-based column index to its width in points."""
+    default = ws.sheet_format.defaultColWidth or (ws.sheet_format.baseColWidth or 8) + 0.71
+    widths = {}
+    for dim in ws.column_dimensions.values():
+        if dim.min is None or dim.max is None:
+            continue
+        width = 0 if dim.hidden else _char_width_to_points(dim.width or default)
+        for col in range(dim.min, dim.max + 1):
+            widths[col] = width
+    default_width = _char_width_to_points(default)
+    return lambda col: widths.get(col, default_width)
+
+
+def _row_heights(ws):
+    """Return a function mapping a 1-based row index to its height in points."""
+    default = ws.sheet_format.defaultRowHeight or 15
+    heights = {}
+    for row, dim in ws.row_dimensions.items():
+        heights[row] = 0 if dim.hidden else (dim.height or default)
+    return lambda row: heights.get(row, default)
+
+
+def _offsets(size, start, stop):
+    """Cumulative edge positions for indices start..stop (stop - start + 2 entries)."""
+    edges = [0.0]
+    for index in range(start, stop + 1):
+        edges.append(edges[-1] + size(index))
+    return edges
+
+
+def _merged_ranges(ws, min_col, min_row, max_col, max_row):
+    """Map every cell inside a merged range to the range bounds (min_col, min_row, max_col, max_row)."""
+    merged = {}
+    for merged_range in ws.merged_cells.ranges:
+        if merged_range.max_col < min_col or merged_range.min_col > max_col:
+            continue
+        if merged_range.max_row < min_row or merged_range.min_row > max_row:
+            continue
+        bounds = (merged_range.min_col, merged_range.min_row, merged_range.max_col, merged_range.max_row)
+        for row in range(merged_range.min_row, merged_range.max_row + 1):
+            for col in range(merged_range.min_col, merged_range.max_col + 1):
+                merged[(col, row)] = bounds
+    return merged
+
+
+def _is_covered(merged, col, row):
+    """True for cells hidden under the top-left cell of a merged range."""
+    bounds = merged.get((col, row))
+    return bounds is not None and (bounds[0], bounds[1]) != (col, row)
+
+
+def _resolve_value(ws, value, depth=0):
+    """Follow simple '=A1' / '=Sheet!A1' references; other formulas cannot be evaluated and render empty."""
+    if isinstance(value, str) and value.startswith('='):
+        match = SIMPLE_REFERENCE.match(value)
+        if match is None or depth > 20:
+            return None
+        quoted_sheet, sheet, col_letters, row = match.groups()
+        sheet = quoted_sheet.replace("''", "'") if quoted_sheet is not None else sheet
+        if sheet is not None:
+            if sheet not in ws.parent.sheetnames:
+                return None
+            ws = ws.parent[sheet]
+        col = column_index_from_string(col_letters.upper())
+        return _resolve_value(ws, ws.cell(int(row), col).value, depth + 1)
+    return value
+
+
+def _cell_texts(ws, min_col, min_row, max_col, max_row):
+    """Return {(col, row): (display text, is_number)} for all non-empty cells in the print area."""
+    texts = {}
+    for row in ws.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col):
+        for cell in row:
+            if cell.value is None:
+                continue
+            value = _resolve_value(ws, cell.value)
+            text = _format_value(value, cell.number_format)
+            if text:
+                is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+                texts[(cell.column, cell.row)] = (text, is_number)
+    return texts
+
+
+def _strftime_pattern(number_format, default):
+    """Translate an Excel date/time number format into a strftime pattern."""
+    number_format = (number_format or '').split(';')[0].lower()
+    number_format = re.sub(r'\[[^\]]*\]|"[^"]*"|\\', '', number_format)
+    if not any(token in number_format for token in ('d', 'm', 'y', 'h', 's')):
+        return default
+    pattern = ''
+    previous = None
+    for token in re.findall(r'yyyy|yy|mmmm|mmm|mm|m|dddd|ddd|dd|d|hh|h|ss|s|am/pm|.', number_format):
+        if token in ('yyyy', 'yy'):
+            pattern += '%Y' if token == 'yyyy' else '%y'
+        elif token in ('mm', 'm'):
+            # 'mm' directly after hours means minutes
+            pattern += '%M' if previous in ('hh', 'h') else '%m'
+        elif token == 'mmmm':
+            pattern += '%B'
+        elif token == 'mmm':
+            pattern += '%b'
+        elif token in ('dd', 'd'):
+            pattern += '%d'
+        elif token == 'dddd':
+            pattern += '%A'
+        elif token == 'ddd':
+            pattern += '%a'
+        elif token in ('hh', 'h'):
+            pattern += '%H'
+        elif token in ('ss', 's'):
+            pattern += '%S'
+        elif token == 'am/pm':
+            pattern = pattern.replace('%H', '%I') + '%p'
+        else:
+            pattern += token.replace('%', '%%')
+            continue
+        previous = token
+    return pattern
+
+
+def _format_value(value, number_format):
+    """Format a cell value the way the sheet displays it."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'WAHR' if value else 'FALSCH'
+    if isinstance(value, datetime.datetime):
+        return value.strftime(_strftime_pattern(number_format, '%d.%m.%Y %H:%M'))
+    if isinstance(value, datetime.date):
+        return value.strftime(_strftime_pattern(number_format, '%d.%m.%Y'))
+    if isinstance(value, datetime.time):
+        return value.strftime(_strftime_pattern(number_format, '%H:%M'))
+    if isinstance(value, (int, float)):
+        return _format_number(value, number_format)
+    return str(value)
+
+
+def _format_number(value, number_format):
+    """
+    Apply fixed-decimal, zero-padding, thousands-separator and percent formats including
+    their literal text; anything else renders like 'General'.
+    """
+    section = (number_format or 'General').split(';')[0]
+    # Keep currency symbols ([$€-407]), drop colour/condition codes and padding directives,
+    # keep quoted and escaped literals
+    section = re.sub(r'\[\$([^\]-]*)[^\]]*\]', r'\1', section)
+    section = re.sub(r'\[[^\]]*\]|_.|\*.', '', section)
+    section = re.sub(r'"([^"]*)"|\\(.)', lambda m: m.group(1) if m.group(1) is not None else m.group(2), section)
+    match = re.search(r'[#0,]*0[#0,]*(?:\.[0#]*)?|\.[0#]+', section)
+    if match is None:
+        return _format_general(value)
+
+    digits = match.group(0)
+    integer_part, _, decimal_part = digits.partition('.')
+    if '%' in section:
+        value = value * 100
+    separator = ',' if ',' in integer_part else ''
+    width = integer_part.count('0')
+    text = f"{abs(value):{separator}.{len(decimal_part)}f}"
+    whole, dot, fraction = text.partition('.')
+    text = whole.rjust(width, '0') + dot + fraction
+    if value < 0 and float(text.replace(',', '')) != 0:
+        text = '-' + text
+    return section[:match.start()] + text + section[match.end():]
+
+
+def _format_general(value):
+    """'General' number display, never in scientific notation."""
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return format(Decimal(repr(value)), 'f')
+
+
+def _apply_tint(hex_rgb, tint):
+    """Lighten (tint > 0) or darken (tint < 0) an RGB hex colour like Excel does."""
+    r, g, b = (int(hex_rgb[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    h, l, s = colorsys.rgb_to_hls(r, g, b)
+    l = l * (1 + tint) if tint < 0 else l * (1 - tint) + tint
+    r, g, b = colorsys.hls_to_rgb(h, l, s)
+    return colors.Color(r, g, b)
+
+
+def _excel_color(color, default=None):
+    """Convert an openpyxl Color to a reportlab colour."""
+    if color is None:
+        return default
     try:
-        # Create temporary Excel file
-        with NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_excel:
-            temp_excel.write(excel_bytes)
-            temp_excel.flush()
-            wb = load_workbook(temp_excel.name)
-            ws = wb.active
-
-        # Create PDF buffer
-        pdf_buffer = io.BytesIO()
-        # Set margins to be small for maximum usable area
-        margin = 18  # 18 points = 0.25 inch
-        doc = SimpleDocTemplate(
-            pdf_buffer,
-            pagesize=A4,
-            leftMargin=margin,
-            rightMargin=margin,
-            topMargin=margin,
-            bottomMargin=margin
-        )
-        story = []
-        styles = getSampleStyleSheet()
-
-        # Add title
-        title = Paragraph("Spielberichtsbogen", styles['Title'])
-        story.append(title)
-        story.append(Spacer(1, 6))
-
-        # Extract key information from Excel
-        data = []
-        for row in ws.iter_rows(min_row=1, max_row=25, values_only=True):
-            if any(cell is not None for cell in row):
-                # Filter out empty cells and format row
-                formatted_row = [str(cell) if cell is not None else "" for cell in row[:6]]
-                if any(formatted_row):
-                    data.append(formatted_row)
-
-        # Create table
-        if data:
-            # Calculate available width for table
-            page_width, page_height = A4
-            usable_width = page_width - doc.leftMargin - doc.rightMargin
-            num_cols = len(data[0]) if data else 6
-            # Distribute columns evenly
-            col_widths = [usable_width / num_cols] * num_cols
-            # Reduce font size and paddings for compactness
-            table = Table(data, colWidths=col_widths)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-                ('TOPPADDING', (0, 0), (-1, -1), 2),
-                ('LEFTPADDING', (0, 0), (-1, -1), 2),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 2),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
-            ]))
-            story.append(table)
-
-        # Build PDF
-        doc.build(story)
-        pdf_buffer.seek(0)
+        if color.type == 'rgb' and isinstance(color.rgb, str):
+            hex_rgb = color.rgb[-6:]
+        elif color.type == 'indexed' and color.indexed is not None and color.indexed < len(COLOR_INDEX):
+            hex_rgb = COLOR_INDEX[color.indexed][-6:]
+        elif color.type == 'theme' and color.theme is not None and color.theme < len(THEME_COLORS):
+            hex_rgb = THEME_COLORS[color.theme]
+        else:
+            return default
+        return _apply_tint(hex_rgb, color.tint or 0)
+    except (TypeError, ValueError):
+        return default
 
-        # Cleanup
-        os.unlink(temp_excel.name)
 
-        return pdf_buffer.read()
+def _draw_gridlines(c, col_x, row_y):
+    c.setStrokeColor(colors.HexColor('#c0c0c0'))
+    c.setLineWidth(0.25)
+    c.setDash()
+    for x in col_x:
+        c.line(x, 0, x, -row_y[-1])
+    for y in row_y:
+        c.line(0, -y, col_x[-1], -y)
+
+
+def _draw_cell_borders(c, cell, bounds, col, row, x0, y0, x1, y1):
+    """Draw the borders of one grid cell; edges inside a merged range are skipped."""
+    border = cell.border
+    if border is None:
+        return
+    sides = (
+        ('left', border.left, (x0, y0, x0, y1), bounds is None or col == bounds[0]),
+        ('right', border.right, (x1, y0, x1, y1), bounds is None or col == bounds[2]),
+        ('top', border.top, (x0, y0, x1, y0), bounds is None or row == bounds[1]),
+        ('bottom', border.bottom, (x0, y1, x1, y1), bounds is None or row == bounds[3]),
+    )
+    for _, side, (ax, ay, bx, by), on_edge in sides:
+        if not on_edge or side is None or side.style not in BORDER_STYLES:
+            continue
+        width, dash = BORDER_STYLES[side.style]
+        c.setStrokeColor(_excel_color(side.color, colors.black))
+        c.setLineWidth(width)
+        c.setDash(list(dash) if dash else [])
+        c.line(ax, -ay, bx, -by)
+
 
-    except ImportError:
-        # Fallback: return original Excel as "PDF"
-        return excel_bytes
+def _draw_image(c, image, col_widths, row_heights, min_col, min_row):
+    """Draw an embedded image at its anchor position relative to the print area."""
+    anchor = image.anchor
+
+    def marker_position(marker):
+        # Anchor markers are 0-based and measured from the sheet origin
+        x = sum(col_widths(col) for col in range(min_col, marker.col + 1)) \
+            - sum(col_widths(col) for col in range(marker.col + 1, min_col))
+        y = sum(row_heights(row) for row in range(min_row, marker.row + 1)) \
+            - sum(row_heights(row) for row in range(marker.row + 1, min_row))
+        return x + marker.colOff / EMU_PER_POINT, y + marker.rowOff / EMU_PER_POINT
+
+    anchor_type = type(anchor).__name__
+    if anchor_type == 'TwoCellAnchor':
+        x0, y0 = marker_position(anchor._from)
+        x1, y1 = marker_position(anchor.to)
+    elif anchor_type == 'OneCellAnchor':
+        x0, y0 = marker_position(anchor._from)
+        x1, y1 = x0 + anchor.ext.width / EMU_PER_POINT, y0 + anchor.ext.height / EMU_PER_POINT
+    elif anchor_type == 'AbsoluteAnchor':
+        x0, y0 = anchor.pos.x / EMU_PER_POINT, anchor.pos.y / EMU_PER_POINT
+        x1, y1 = x0 + anchor.ext.width / EMU_PER_POINT, y0 + anchor.ext.height / EMU_PER_POINT
+    else:
+        x0, y0 = marker_position(_cell_marker(anchor))
+        x1, y1 = x0 + image.width * 0.75, y0 + image.height * 0.75
+
+    try:
+        reader = ImageReader(io.BytesIO(image._data()))
+        c.drawImage(reader, x0, -y1, x1 - x0, y1 - y0, mask='auto')
     except Exception as e:
-        raise Exception(f"Alternative PDF conversion failed: {str(e)}")
+        print(f"Error drawing image: {e}")
+
+
+def _cell_marker(anchor):
+    """Build a 0-based marker for images anchored by a cell reference string like 'A1'."""
+    from openpyxl.drawing.spreadsheet_drawing import AnchorMarker
+    min_col, min_row, _, _ = range_boundaries(str(anchor))
+    return AnchorMarker(col=min_col - 1, row=min_row - 1)
+
+
+def _horizontal_alignment(cell, is_number):
+    horizontal = cell.alignment.horizontal if cell.alignment else None
+    if horizontal in (None, 'general'):
+        return 'right' if is_number else 'left'
+    if horizontal in ('center', 'centerContinuous', 'distributed', 'justify'):
+        return 'center'
+    if horizontal == 'fill':
+        return 'left'
+    return horizontal
+
+
+def _overflow_rect(rect, cell, is_number, values, merged, col, row, min_col, max_col, col_x):
+    """Unwrapped text spills into empty neighbours, like in Excel and LibreOffice."""
+    x0, y0, x1, y1 = rect
+    if cell.alignment is not None and (cell.alignment.wrap_text or cell.alignment.shrink_to_fit):
+        return rect
+
+    def is_free(neighbour):
+        return (neighbour, row) not in values and (neighbour, row) not in merged
+
+    horizontal = _horizontal_alignment(cell, is_number)
+    if horizontal in ('left', 'center'):
+        neighbour = col + 1
+        while neighbour <= max_col and is_free(neighbour):
+            neighbour += 1
+        x1 = col_x[neighbour - min_col]
+    if horizontal in ('right', 'center'):
+        neighbour = col - 1
+        while neighbour >= min_col and is_free(neighbour):
+            neighbour -= 1
+        x0 = col_x[neighbour - min_col + 1]
+    return x0, y0, x1, y1
+
+
+def _register_ttf_faces(faces):
+    """
+    Register the TrueType faces of one family and return their names, or None if the
+    regular face is not installed. Missing bold/italic faces reuse the closest upright one.
+    """
+    paths = [os.path.join(FONT_ROOT, face) for face in faces]
+    if not os.path.exists(paths[0]):
+        return None
+
+    names = []
+    for index, path in enumerate(paths):
+        if not os.path.exists(path):
+            # Italic -> upright face of the same weight, bold -> regular
+            names.append(names[index - 2] if index >= 2 else names[0])
+            continue
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(TTFont(name, path))
+        names.append(name)
+    pdfmetrics.registerFontFamily(names[0], normal=names[0], bold=names[1], italic=names[2], boldItalic=names[3])
+    return tuple(names)
+
+
+def _font_family(family_name):
+    """Resolve (once) the reportlab font names used for an Excel font family."""
+    key = (family_name or '').lower()
+    if key not in _resolved_font_families:
+        candidates, fallback = FONT_FAMILIES.get(key, DEFAULT_FONT_FAMILY)
+        names = None
+        for faces in candidates:
+            names = _register_ttf_faces(faces)
+            if names is not None:
+                break
+        if names is None:
+            print(f"No TrueType font found for '{family_name}' in {FONT_ROOT}, using {fallback[0]} (cp1252 only)")
+            names = fallback
+        _resolved_font_families[key] = names
+    return _resolved_font_families[key]
+
+
+def _font_name(font):
+    family = _font_family(font.name)
+    return family[(1 if font.b else 0) + (2 if font.i else 0)]
+
+
+def _draw_cell_text(c, text, cell, rect, clip, is_number):
+    """Draw the cell text inside rect honouring font, alignment and wrapping; clipped to clip."""
+    x0, y0, x1, y1 = rect
+    font = cell.font
+    font_name = _font_name(font)
+    font_size = float(font.sz or 11)
+    alignment = cell.alignment
+    horizontal = _horizontal_alignment(cell, is_number)
+    vertical = (alignment.vertical if alignment else None) or 'bottom'
+    available_width = max(x1 - x0 - 2 * CELL_PADDING, 1)
+
+    lines = text.split('\n')
+    if alignment is not None and alignment.wrap_text:
+        lines = [part for line in lines for part in (simpleSplit(line, font_name, font_size, available_width) or [''])]
+    elif alignment is not None and alignment.shrink_to_fit:
+        widest = max(stringWidth(line, font_name, font_size) for line in lines)
+        if widest > available_width:
+            font_size *= available_width / widest
+
+    line_height = font_size * LINE_SPACING
+    text_height = line_height * len(lines)
+    if vertical == 'top':
+        line_top = y0 + CELL_PADDING / 2
+    elif vertical in ('center', 'justify', 'distributed'):
+        line_top = y0 + (y1 - y0 - text_height) / 2
+    else:
+        line_top = y1 - CELL_PADDING / 2 - text_height
+
+    cx0, cy0, cx1, cy1 = clip
+    c.saveState()
+    path = c.beginPath()
+    path.rect(cx0, -cy1, cx1 - cx0, cy1 - cy0)
+    c.clipPath(path, stroke=0, fill=0)
+    c.setFont(font_name, font_size)
+    c.setFillColor(_excel_color(font.color, colors.black))
+    for index, line in enumerate(lines):
+        baseline = line_top + index * line_height + font_size * 0.93
+        if horizontal == 'center':
+            c.drawCentredString((x0 + x1) / 2, -baseline, line)
+        elif horizontal == 'right':
+            c.drawRightString(x1 - CELL_PADDING, -baseline, line)
+        else:
+            c.drawString(x0 + CELL_PADDING, -baseline, line)
+    c.restoreState()
@@ -247,20 +247,23 @@ class SpielberichtApp {
                 body: JSON.stringify({ listing: this.latestEinsaetzeListing, filteredTeams })
             });
             if (!response.ok) throw new Error('PDF Export fehlgeschlagen');
-            const blob = await response.blob();
-            const url = window.URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = 'einsaetze_uebersicht.pdf';
-            document.body.appendChild(a);
-            a.click();
-            a.remove();
-            window.URL.revokeObjectURL(url);
+            const result = await response.json();
+            this.downloadArtifact(result.url, result.filename);
         } catch (err) {
             alert('Fehler beim PDF Export: ' + err.message);
         }
     }
 
+    downloadArtifact(url, filename) {
+        // A normal link download lets the browser resume (Range) and revalidate (ETag) the file
+        const a = document.createElement('a');
+        a.href = url;
+        a.download = filename;
+        document.body.appendChild(a);
+        a.click();
+        a.remove();
+    }
+
     bindEvents() {
         console.log("Binding events");
         // File upload form
@@ -762,26 +765,9 @@ class SpielberichtApp {
             });
 
             if (response.ok) {
-                // Get filename from response headers
-                const contentDisposition = response.headers.get('Content-Disposition');
-                let filename = 'spielberichte.pdf';
-                if (contentDisposition) {
-                    const matches = /filename=([^;]+)/.exec(contentDisposition);
-                    if (matches) {
-                        filename = matches[1];
-                    }
-                }
-
-                // Download the file
-                const blob = await response.blob();
-                const url = window.URL.createObjectURL(blob);
-                const a = document.createElement('a');
-                a.href = url;
-                a.download = filename;
-                document.body.appendChild(a);
-                a.click();
-                document.body.removeChild(a);
-                window.URL.revokeObjectURL(url);
+                // The server returns the URL of the stored PDF; download it with a plain GET
+                const result = await response.json();
+                this.downloadArtifact(result.url, result.filename || 'spielberichte.pdf');
 
                 this.showStatus(`${selectedIds.length} Spielberichte erfolgreich generiert und heruntergeladen!`, 'success');
             } else {